@@ -1,13 +1,15 @@
 import asyncio
+import aiohttp
 import feedparser
-import json
+import orjson
 import os
 import hashlib
+from collections import Counter, deque
 from datetime import datetime, timedelta, timezone
-from io import BytesIO
 from telegram import Update
 from telegram.ext import Application, CommandHandler, ContextTypes
 from telegram.constants import ParseMode
+from pybloom_live import ScalableBloomFilter
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -61,15 +63,34 @@ RSS_FEEDS = {
     ],
 }
 
+# Flattened once at import time: the fetch loop iterates plain
+# (name, url) pairs instead of doing two dict lookups per feed per cycle
+FEEDS = tuple((f['name'], f['url']) for f in RSS_FEEDS['tech'])
+
+
+# Hard cap on any fetched feed/article body: bounds worst-case parse
+# cost and keeps a pathological upstream from exhausting memory
+MAX_FEED_BYTES = 2_000_000
 
 SENT_FILE = 'sent_news.json'
 PENDING_FILE = 'pending.json'
-BLOCKS_FILE = 'blocks.json'
+BLOCKS_FILE = 'blocks.jsonl'
+FEED_CACHE_FILE = 'feed_cache.json'
 
 # Global storage
 sent_news = {}
+# (link, iso_ts) pairs in broadcast order: expired entries are popped
+# from the left instead of rebuilding the whole dict
+sent_order = deque()
 pending = {}
-blocks = [] 
+blocks = []
+blocks_by_number = {}
+feed_cache = {}
+# Bloom filter over sent_news keys: rejects the common "never seen" case
+# in constant time before touching the dict of full URL strings
+seen_bf = ScalableBloomFilter(initial_capacity=10_000, error_rate=0.001)
+# Running per-source tally, kept in sync as blocks are appended
+source_counts = Counter()
 
 # ==================== PERSISTENCE FUNCTIONS ====================
 
@@ -77,49 +98,130 @@ def load_json(path, default):
     """Load JSON safely"""
     try:
         if os.path.exists(path):
-            with open(path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with open(path, 'rb') as f:
+                return orjson.loads(f.read())
     except Exception as e:
-        print(f"[ERROR] Failed to load {path}: {e}")        
+        print(f"[ERROR] Failed to load {path}: {e}")
     return default
 
 def save_json(path, data):
     """Save JSON safely"""
     try:
-        with open(path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
     except Exception as e:
         print(f"[ERROR] Failed to save {path}: {e}")
 
+def load_jsonl(path, default):
+    """Load a JSON Lines file safely (one record per line)"""
+    try:
+        if os.path.exists(path):
+            records = []
+            with open(path, 'rb') as f:
+                for lineno, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        records.append(orjson.loads(line))
+                    except Exception:
+                        # A torn line (crash mid-append) must not discard
+                        # the rest of the log
+                        print(f"[WARN] Skipping unparseable line {lineno} in {path}")
+            return records
+    except Exception as e:
+        print(f"[ERROR] Failed to load {path}: {e}")
+    return default
+
+def append_jsonl(path, record):
+    """Append a single record to a JSON Lines file"""
+    try:
+        with open(path, 'ab') as f:
+            f.write(orjson.dumps(record) + b'\n')
+    except Exception as e:
+        print(f"[ERROR] Failed to append to {path}: {e}")
+
+# Background writer state: path -> latest data awaiting flush. Repeated
+# marks for the same path collapse into a single write.
+_dirty_paths = {}
+_dirty_event = asyncio.Event()
+
+def mark_dirty(path, data):
+    """Hand a file to the background writer instead of writing inline"""
+    _dirty_paths[path] = data
+    _dirty_event.set()
+
+async def storage_writer():
+    """Flush dirty JSON files off the event loop, debounced per burst"""
+    while True:
+        await _dirty_event.wait()
+        _dirty_event.clear()
+        # Debounce: let a burst of marks (e.g. one mined block touching
+        # three files) coalesce before flushing
+        await asyncio.sleep(0.5)
+        while _dirty_paths:
+            path, data = _dirty_paths.popitem()
+            # Snapshot on the loop thread so the write sees a consistent state
+            snapshot = data.copy() if hasattr(data, 'copy') else data
+            await asyncio.to_thread(save_json, path, snapshot)
+
 def init_storage():
     """Initialize storage files"""
-    global sent_news, pending, blocks
-    
+    global sent_news, sent_order, pending, blocks, blocks_by_number, feed_cache, seen_bf, source_counts
+    global _verified_upto, _last_verified_hash
+
+    # Freshly loaded chain has not been verified yet
+    _verified_upto = 0
+    _last_verified_hash = None
+
     # Load sent news history (last 30 days)
     sent_news = load_json(SENT_FILE, {})
     cutoff = (datetime.now() - timedelta(days=30)).isoformat()
     sent_news = {k: v for k, v in sent_news.items() if v >= cutoff}
+    sent_order = deque(sorted(sent_news.items(), key=lambda kv: kv[1]))
+
+    # Rebuild the Bloom filter from the pruned history: restarting is
+    # what keeps the filter's size bounded over time
+    seen_bf = ScalableBloomFilter(initial_capacity=10_000, error_rate=0.001)
+    for k in sent_news:
+        seen_bf.add(k)
 
     # Load pending news
     pending = load_json(PENDING_FILE, {})
     
-    # Load blockchain
-    blocks = load_json(BLOCKS_FILE, [])
+    # Load blockchain (append-only JSONL, one block per line)
+    blocks = load_jsonl(BLOCKS_FILE, [])
+    # iHashes are hex on disk but raw bytes in memory
+    for b in blocks:
+        for n in b['news']:
+            n['iHash'] = bytes.fromhex(n['iHash'])
+    blocks_by_number = {b['block_number']: b for b in blocks}
+
+    # Load per-feed conditional GET cache (ETag/Last-Modified + last items)
+    feed_cache = load_json(FEED_CACHE_FILE, {})
+
+    # Seed the running source tally from the loaded chain
+    source_counts = Counter()
+    for b in blocks:
+        source_counts.update(n['source'] for n in b['news'])
 
     # Save cleaned state
     save_json(SENT_FILE, sent_news)
     save_json(PENDING_FILE, pending)
-    save_json(BLOCKS_FILE, blocks)
-    
-    # If no blocks exist, create a genesis block and persist it
-    if not blocks:
+
+    # If no blocks exist, create a genesis block and persist it — but
+    # never append one onto an existing file that merely failed to load
+    if not blocks and not os.path.exists(BLOCKS_FILE):
         try:
             genesis = create_genesis_block()
             blocks.append(genesis)
-            save_json(BLOCKS_FILE, blocks)
+            blocks_by_number[genesis['block_number']] = genesis
+            source_counts.update(n['source'] for n in genesis['news'])
+            append_jsonl(BLOCKS_FILE, block_to_json(genesis))
             print("[SYSTEM] Genesis Block initialized - The Guardian 05/Nov/2025")
         except Exception as e:
             print(f"[ERROR] Failed to create genesis block: {e}")
+    elif not blocks:
+        print(f"[WARN] {BLOCKS_FILE} exists but produced no blocks; not creating genesis")
 
     print(f"[SYSTEM] Storage loaded: {len(sent_news)} news, {len(pending)} pending, {len(blocks)} blocks")
 
@@ -130,7 +232,7 @@ def create_genesis_block():
     link = "https://www.theguardian.com/business/2025/nov/05/global-stock-markets-fall-sharply-over-ai-bubble-fears"
     source = "The Guardian"
     published = "2025-11-05"
-    ihash = hashlib.sha256((title + link + source + published).encode('utf-8')).hexdigest()
+    ihash = create_iHash(title, link, source, published)
 
     genesis_block = {
         "block_number": 0,
@@ -143,31 +245,51 @@ def create_genesis_block():
             "summary": "Global stock markets fall sharply amid fears of an AI-driven financial bubble collapse.",
             "iHash": ihash
         }],
-        "blockhash": hashlib.sha256(ihash.encode('utf-8')).hexdigest(),
+        "blockhash": compute_block_hash([ihash]),
         "previous": None
     }
     return genesis_block
 
 
-def create_iHash(title: str, link: str, source: str, published: str) -> str:
-    """Create a unique hash for a news item (iHash)"""
-    data = (title or "") + (link or "") + (source or "") + (published or "")
-    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+def create_iHash(title: str, link: str, source: str, published: str) -> bytes:
+    """Create a unique hash for a news item (iHash, raw 32-byte digest)"""
+    # Feed the hash incrementally instead of concatenating strings first:
+    # no intermediate str/bytes allocation per item
+    h = hashlib.sha256()
+    for s in (title, link, source, published):
+        if s:
+            h.update(s.encode('utf-8'))
+    return h.digest()
 
 def compute_block_hash(iHashes: list) -> str:
-    """Compute block hash based on the iHashes of the news items"""
-    sorted_hashes = sorted(iHashes)
-    concat = "".join(sorted_hashes)
-    return hashlib.sha256(concat.encode('utf-8')).hexdigest()
+    """Compute block hash based on the iHashes (bytes) of the news items"""
+    h = hashlib.sha256()
+    for x in sorted(iHashes):
+        h.update(x)
+    return h.hexdigest()
+
+def block_to_json(block: dict) -> dict:
+    """Copy of a block with iHashes hex-encoded for the JSON boundary"""
+    return {
+        **block,
+        'news': [{**n, 'iHash': n['iHash'].hex()} for n in block['news']]
+    }
 
 # ==================== BLOCKCHAIN FUNCTIONS ====================
 
+# Verification cursor: blocks up to _verified_upto have already passed
+# verify_chain, so subsequent calls only re-check what was appended since
+_verified_upto = 0
+_last_verified_hash = None
+
 def verify_chain() -> bool:
     """Verify blockchain integrity"""
+    global _verified_upto, _last_verified_hash
+
     if len(blocks) <= 1:
         return True
 
-    for i in range(1, len(blocks)):
+    for i in range(max(1, _verified_upto + 1), len(blocks)):
         # Check if the previous hash matches
         if blocks[i]['previous'] != blocks[i-1]['blockhash']:
             print(f"[ERROR] Block #{blocks[i]['block_number']}: previous hash mismatch")
@@ -179,101 +301,175 @@ def verify_chain() -> bool:
             print(f"[ERROR] Block #{blocks[i]['block_number']}: invalid blockhash")
             return False
 
+    _verified_upto = len(blocks) - 1
+    _last_verified_hash = blocks[-1]['blockhash']
     return True
 
 
-def get_stats() -> dict:
+def prune_sent():
+    """Drop sent_news entries older than 30 days from the left of the window"""
+    cutoff = (datetime.now() - timedelta(days=30)).isoformat()
+    expired = 0
+    while sent_order and sent_order[0][1] < cutoff:
+        link, _ = sent_order.popleft()
+        sent_news.pop(link, None)
+        expired += 1
+    if expired:
+        # The Bloom filter keeps the stale keys until its restart-time
+        # rebuild; the dict confirm step keeps the check correct
+        mark_dirty(SENT_FILE, sent_news)
+        print(f"[SYSTEM] Pruned {expired} expired entries from history")
+
+def get_stats() -> Counter:
     """Return source statistics"""
-    sources = {}
-    for block in blocks:
-        for news in block['news']:
-            source = news['source']
-            sources[source] = sources.get(source, 0) + 1
-    return sources
+    return source_counts
 
 # ==================== NEWS FUNCTIONS ====================
 
-def fetch_rss_items(limits_per_feed=3) -> list:
-    """Fetch news from all RSS feeds"""
+# Shared HTTP session: keep-alive connections are reused across mining
+# cycles instead of paying a fresh TCP+TLS handshake per feed per cycle
+_http = None
+
+async def get_http_session() -> aiohttp.ClientSession:
+    """Return the shared HTTP session, creating it on first use"""
+    global _http
+    if _http is None or _http.closed:
+        _http = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=10),
+            connector=aiohttp.TCPConnector(
+                limit=32,
+                limit_per_host=4,
+                keepalive_timeout=75,
+                ttl_dns_cache=300
+            )
+        )
+    return _http
+
+async def fetch_one(session: aiohttp.ClientSession, name: str, url: str, limits_per_feed: int) -> list:
+    """Fetch and parse a single RSS feed (conditional GET when cached)"""
     items = []
 
-    for feed_info in RSS_FEEDS.get('tech', []):
-        try:
-            feed = feedparser.parse(feed_info['url'])
-            # FIXED: correct slice
-            for entry in feed.entries[:limits_per_feed]:
-                link = entry.get('link', '').strip()
-                title = entry.get('title', '').strip()
-                published = entry.get('published', '') or entry.get('updated', '')
-                summary = entry.get('summary', '') or entry.get('description', '')
-
-                if not link:
-                    continue
-                
-                items.append({
-                    'title': title or link,
-                    'link': link,
-                    'source': feed_info['name'],
-                    'published': published,
-                    'summary': summary[:300] if summary else ''
-                })
-        except Exception as e:
-            print(f"[ERROR] Failed to fetch RSS from {feed_info['name']}: {e}")
-    
+    cached = feed_cache.get(url, {})
+    headers = {}
+    if cached.get('etag'):
+        headers['If-None-Match'] = cached['etag']
+    if cached.get('modified'):
+        headers['If-Modified-Since'] = cached['modified']
+
+    async with session.get(url, headers=headers) as resp:
+        if resp.status == 304:
+            # Feed unchanged since last poll: reuse cached items, skip parsing
+            return cached.get('items', [])[:limits_per_feed]
+        if resp.status != 200:
+            # Error responses must not overwrite good cached state (their
+            # validators could pin an empty item list on later 304s)
+            print(f"[WARN] HTTP {resp.status} from {url}, using cached items")
+            return cached.get('items', [])[:limits_per_feed]
+        body = await resp.content.read(MAX_FEED_BYTES)
+        if await resp.content.read(1):
+            print(f"[WARN] Feed exceeds {MAX_FEED_BYTES} bytes, skipping: {url}")
+            return cached.get('items', [])[:limits_per_feed]
+        etag = resp.headers.get('ETag')
+        modified = resp.headers.get('Last-Modified')
+
+    # Parse in a worker thread: feedparser is pure Python and a cache-miss
+    # cycle can mean 25 multi-MB bodies, too much to chew on the event loop
+    feed = await asyncio.to_thread(feedparser.parse, body)
+    # Cache every entry unsliced; limits_per_feed is applied on return so
+    # a cached 304 hit can serve callers with a higher limit
+    for entry in feed.entries:
+        link = entry.get('link', '').strip()
+        title = entry.get('title', '').strip()
+        published = entry.get('published', '') or entry.get('updated', '')
+        summary = entry.get('summary', '') or entry.get('description', '')
+
+        if not link:
+            continue
+
+        # Truncate once here so the mining path never re-slices
+        items.append({
+            'title': (title or link)[:280],
+            'link': link,
+            'source': name,
+            'published': published,
+            'summary': summary[:300] if summary else ''
+        })
+
+    feed_cache[url] = {'etag': etag, 'modified': modified, 'items': items}
+
+    return items[:limits_per_feed]
+
+async def fetch_rss_items_async(limits_per_feed=3) -> list:
+    """Fetch news from all RSS feeds concurrently"""
+    items = []
+
+    session = await get_http_session()
+
+    tasks = [fetch_one(session, name, url, limits_per_feed) for name, url in FEEDS]
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    for (name, url), result in zip(FEEDS, results):
+        if isinstance(result, Exception):
+            print(f"[ERROR] Failed to fetch RSS from {name}: {result}")
+        else:
+            items.extend(result)
+
+    mark_dirty(FEED_CACHE_FILE, feed_cache)
+
     return items
 
 def format_block_message(block: dict) -> str:
     """Format a block for sending to Telegram"""
-    header = f"[BLOCK #{block['block_number']}]\n"
-    header += f"TIME: {block['timestamp']} UTC\n"
-    header += f"NEWS: {len(block['news'])}\n"
-    header += f"HASH: `{block['blockhash'][:16]}...`\n"
-    if block.get('previous'):
-        header += f"PREV: `{block['previous'][:16]}...`\n"
-    header += "\n"
-    
-    lines = [header]
-    
-    for i, n in enumerate(block['news'], 1):
-        lines.append(f"{i}. *{n['source']}* — {n['title'][:100]}")
-        if n.get('link'):
-            lines.append(f"   > {n['link']}")
-        lines.append(f"   `iHash: {n['iHash'][:16]}...`\n")
-    
-    return "\n".join(lines)
+    prev = f"PREV: `{block['previous'][:16]}...`\n" if block.get('previous') else ""
+    parts = [
+        f"[BLOCK #{block['block_number']}]\n"
+        f"TIME: {block['timestamp']} UTC\n"
+        f"NEWS: {len(block['news'])}\n"
+        f"HASH: `{block['blockhash'][:16]}...`\n"
+        f"{prev}\n"
+    ]
+    parts.extend(
+        f"{i}. *{n['source']}* — {n['title'][:100]}"
+        + (f"\n   > {n['link']}" if n.get('link') else "")
+        + f"\n   `iHash: {n['iHash'].hex()[:16]}...`\n"
+        for i, n in enumerate(block['news'], 1)
+    )
+    return "\n".join(parts)
  
 def build_block_from_items(items: list, max_news=5) -> dict:
     """Create a new block from a list of news items"""
     selected = []
     iHashes = []
+    iHashes_set = set()
+    seen_links = set()
 
     for it in items:
         link = it['link']
 
-        if link in sent_news:
+    # Skip if already sent (Bloom rejects first, dict confirms on a hit)
+    # or already taken from this candidate batch
+        if (link in seen_bf and link in sent_news) or link in seen_links:
             continue
 
-    # Skip if already sent
-        if link in sent_news:
-            continue
-        
     # Create iHash
         ih = create_iHash(it['title'], link, it['source'], it['published'])
         
     # Skip duplicates (same iHash)
-        if ih in iHashes:
+        if ih in iHashes_set:
             continue
         
         selected.append({
-            'title': it.get('title', '')[:280],
+            'title': it.get('title', ''),
             'link': link,
             'source': it.get('source', ''),
             'published': it.get('published', ''),
-            'summary': it.get('summary', '')[:300],
+            'summary': it.get('summary', ''),
             'iHash': ih
         })
         iHashes.append(ih)
-        
+        iHashes_set.add(ih)
+        seen_links.add(link)
+
         if len(selected) >= max_news:
             break
     
@@ -298,14 +494,26 @@ def build_block_from_items(items: list, max_news=5) -> dict:
     # Update storage
     for n in selected:
         sent_news[n['link']] = timestamp
+        sent_order.append((n['link'], timestamp))
+        seen_bf.add(n['link'])
         if n['link'] in pending:
             del pending[n['link']]
     
     blocks.append(block)
-    save_json(SENT_FILE, sent_news)
-    save_json(PENDING_FILE, pending)
-    save_json(BLOCKS_FILE, blocks)
-    
+    blocks_by_number[block['block_number']] = block
+    append_jsonl(BLOCKS_FILE, block_to_json(block))
+    source_counts.update(n['source'] for n in selected)
+
+    # Advance the verification cursor if the new block extends an
+    # already-verified tip; otherwise the next verify_chain re-checks it
+    global _verified_upto, _last_verified_hash
+    if block['previous'] == _last_verified_hash:
+        _verified_upto += 1
+        _last_verified_hash = block['blockhash']
+
+    mark_dirty(SENT_FILE, sent_news)
+    mark_dirty(PENDING_FILE, pending)
+
     return block
 
 # ==================== BOT COMMANDS ====================
@@ -345,7 +553,14 @@ async def submit(update: Update, context: ContextTypes.DEFAULT_TYPE):
     published = ""
     
     try:
-        parsed = feedparser.parse(link)
+        # Fetch the (size-capped) body ourselves, then parse it in a
+        # worker thread with a hard timeout so handlers stay responsive
+        session = await get_http_session()
+        async with session.get(link) as resp:
+            body = await resp.content.read(MAX_FEED_BYTES)
+        parsed = await asyncio.wait_for(
+            asyncio.to_thread(feedparser.parse, body), timeout=5.0
+        )
         if parsed and parsed.feed and parsed.entries:
             entry = parsed.entries[0]
             title = entry.get('title', title)
@@ -354,11 +569,11 @@ async def submit(update: Update, context: ContextTypes.DEFAULT_TYPE):
     except Exception as e:
         print(f"[ERROR] Failed to parse link: {e}")
 
-    # Create iHash
-    ih = create_iHash(title, link, source, published)
-    
+    # Create iHash (hex here: pending is serialized to JSON and shown to the user)
+    ih = create_iHash(title, link, source, published).hex()
+
     # Check duplicates
-    if link in sent_news:
+    if link in seen_bf and link in sent_news:
         await update.message.reply_text("[ERROR] News already broadcasted.")
         return
     
@@ -366,9 +581,9 @@ async def submit(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("[WARN] News already in pending queue.")
         return
     
-    # Add to pending
+    # Add to pending (title bounded here, like the RSS fetch path)
     pending[link] = {
-        'title': title,
+        'title': title[:280],
         'link': link,
         'source': source,
         'published': published,
@@ -377,7 +592,7 @@ async def submit(update: Update, context: ContextTypes.DEFAULT_TYPE):
         'added_at': datetime.now(timezone.utc).isoformat(),
         'iHash': ih
     }
-    save_json(PENDING_FILE, pending)
+    mark_dirty(PENDING_FILE, pending)
     
     await update.message.reply_text(
         f"[SUCCESS] News submitted by {user}\n"
@@ -391,27 +606,25 @@ async def mine(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text("[SYSTEM] Mining block...")
     
     # Fetch RSS news
-    rss_items = fetch_rss_items(limits_per_feed=3)
-    candidates = []
+    rss_items = await fetch_rss_items_async(limits_per_feed=3)
 
-    # Add pending submissions
+    # Candidates keyed by link: pending submissions win over RSS items
+    # with the same link (build_block_from_items owns the sent checks)
+    candidates = {}
     for link, p in pending.items():
-        candidates.append({
+        candidates[link] = {
             'title': p.get('title'),
             'link': link,
             'source': p.get('source'),
             'published': p.get('published'),
             'summary': ''
-        })
-    
-    # Add RSS news
+        }
     for it in rss_items:
-        if it['link'] not in sent_news and it['link'] not in pending:
-            candidates.append(it)
+        candidates.setdefault(it['link'], it)
 
     # Create block
-    block = build_block_from_items(candidates, max_news=5)
-    
+    block = build_block_from_items(list(candidates.values()), max_news=5)
+
     if not block:
         await update.message.reply_text("[ERROR] Insufficient new data for block mining.")
         return
@@ -449,7 +662,7 @@ async def block_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
     
     # Search block
-    found = next((b for b in blocks if b['block_number'] == n), None)
+    found = blocks_by_number.get(n)
     
     if not found:
         await update.message.reply_text(f"[ERROR] Block #{n} not found.")
@@ -515,18 +728,16 @@ async def export(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
     
     await update.message.reply_text("[SYSTEM] Generating export file...")
-    
+
     try:
-        # Create complete JSON 
-        data = json.dumps(blocks, indent=2, ensure_ascii=False)
-        file = BytesIO(data.encode('utf-8'))
-        file.name = f"bicle_blockchain_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        
-        await update.message.reply_document(
-            document=file,
-            filename=file.name,
-            caption=f"[EXPORT] Blockchain exported: {len(blocks)} blocks"
-        )
+        # The chain already lives on disk as JSONL: stream the file as-is
+        # instead of re-serializing the whole chain in memory
+        with open(BLOCKS_FILE, 'rb') as f:
+            await update.message.reply_document(
+                document=f,
+                filename=f"bicle_blockchain_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl",
+                caption=f"[EXPORT] Blockchain exported: {len(blocks)} blocks"
+            )
     except Exception as e:
         await update.message.reply_text(f"[ERROR] Export failed: {e}")
 
@@ -537,16 +748,13 @@ async def stats_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
     
     sources = get_stats()
-    
-    # Order by quantity
-    sorted_sources = sorted(sources.items(), key=lambda x: x[1], reverse=True)
-    
+
     msg = "[STATISTICS] Source Distribution\n\n"
-    
-    for source, count in sorted_sources[:10]:  # Top 10
+
+    for source, count in sources.most_common(10):  # Top 10
         msg += f"| {source}: {count} entries\n"
-    
-    total = sum(sources.values())
+
+    total = sources.total()
     msg += f"\n[TOTAL] {total} entries across {len(blocks)} blocks"
     
     await update.message.reply_text(msg, parse_mode=ParseMode.MARKDOWN)
@@ -572,28 +780,28 @@ async def status(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def auto_mine_job(context: ContextTypes.DEFAULT_TYPE):
     """Automatic mining job (runs every 5 minutes if CHANNEL_ID configured)"""
     print("[AUTO-MINE] Initializing mining cycle...")
-    
+
+    # Expire old history before collecting candidates
+    prune_sent()
+
     # Fetch news
-    rss_items = fetch_rss_items(limits_per_feed=2)
-    candidates = []
+    rss_items = await fetch_rss_items_async(limits_per_feed=2)
 
-    # Add pending
+    # Candidates keyed by link: pending wins over RSS on the same link
+    candidates = {}
     for link, p in pending.items():
-        candidates.append({
+        candidates[link] = {
             'title': p['title'],
             'link': link,
             'source': p['source'],
             'published': p['published'],
             'summary': ''
-        })
-
-    # Add RSS
+        }
     for it in rss_items:
-        if it['link'] not in sent_news and it['link'] not in pending:
-            candidates.append(it)
+        candidates.setdefault(it['link'], it)
 
     # Create block
-    block = build_block_from_items(candidates, max_news=5)
+    block = build_block_from_items(list(candidates.values()), max_news=5)
     
     if block and CHANNEL_ID:
         msg = format_block_message(block)
@@ -612,6 +820,34 @@ async def auto_mine_job(context: ContextTypes.DEFAULT_TYPE):
 
 # ==================== MAIN ====================
 
+_writer_task = None
+
+async def post_init(application):
+    """Start background tasks once the event loop is running"""
+    # Plain asyncio task with a module-level handle: post_init runs before
+    # Application.start(), so Application.create_task would not track it
+    global _writer_task
+    _writer_task = asyncio.create_task(storage_writer())
+
+async def post_shutdown(application):
+    """Close shared resources on shutdown"""
+    if _writer_task is not None:
+        _writer_task.cancel()
+        try:
+            await _writer_task
+        except asyncio.CancelledError:
+            pass
+
+    # Flush anything still inside the debounce window: the block append is
+    # synchronous, so losing the matching sent_news/pending update here
+    # would re-mine the same links after restart
+    while _dirty_paths:
+        path, data = _dirty_paths.popitem()
+        save_json(path, data)
+
+    if _http is not None and not _http.closed:
+        await _http.close()
+
 def main():
     """Main function"""
     print("\n[INIT] BICLE Node v0.1 - The Decentralized Feed Protocol")
@@ -626,7 +862,7 @@ def main():
     init_storage()
     
     # Create application
-    app = Application.builder().token(TOKEN).build()
+    app = Application.builder().token(TOKEN).post_init(post_init).post_shutdown(post_shutdown).build()
 
     # Register commands
     app.add_handler(CommandHandler("start", start))